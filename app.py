@@ -1,10 +1,14 @@
+import io
+import json
+import os
+import tempfile
 import streamlit as st
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import matplotlib.pyplot as plt
-import seaborn as sns
-import networkx as nx
-from mlxtend.preprocessing import TransactionEncoder
-from mlxtend.frequent_patterns import apriori, association_rules, fpgrowth
+from scipy.sparse import csr_matrix
 
 # Page Configuration
 st.set_page_config(
@@ -59,37 +63,403 @@ st.markdown("""
 st.title("🛒 Swift-Cart Strategy Dashboard")
 st.markdown("**Strategic Cross-Selling & Inventory Placement Analysis**")
 
+DATA_PATH = "swiftcart_transactions_P4.csv"
+
+# All loaders below are keyed on (path, mtime) so Streamlit reruns hit the cache
+# and only a changed CSV triggers a fresh mining pass.
+@st.cache_data
+def load_data(path, mtime):
+    df = pd.read_csv(path)
+    df['Product_Name'] = df['Product_Name'].str.strip().str.title()
+    return df
+
 @st.cache_data
-def load_data():
+def build_basket(path, mtime):
+    df = load_data(path, mtime)
+    # One-hot encode straight into CSR: rows sorted by transaction give indptr
+    # via searchsorted, so memory is proportional to the filled cells only.
+    tx_ids = df['Transaction_ID'].astype('category')
+    products = df['Product_Name'].astype('category')
+    tx_codes = tx_ids.cat.codes.to_numpy()
+    order = np.argsort(tx_codes, kind='stable')
+    indices = products.cat.codes.to_numpy()[order].astype(np.int32)
+    n_tx = len(tx_ids.cat.categories)
+    indptr = np.searchsorted(tx_codes[order], np.arange(n_tx + 1))
+    matrix = csr_matrix(
+        (np.ones_like(indices, dtype=bool), indices, indptr),
+        shape=(n_tx, len(products.cat.categories))
+    )
+    # Repeated products in one transaction collapse to a single True
+    matrix.sum_duplicates()
+    return pd.DataFrame.sparse.from_spmatrix(matrix, columns=products.cat.categories)
+
+# Lowest support mined; pages needing a stricter threshold filter this frame.
+MIN_SUPPORT = 0.01
+# FP-Growth avoids apriori's candidate generation, but on small catalogues a
+# level-wise scan over packed bitsets (apriori_bitsets) is the cheaper of the two.
+APRIORI_MAX_ITEMS = 500
+
+# Helpers to convert whole arrays of frozensets without pandas' per-row apply
+frozen_to_str = np.vectorize(lambda fset: ', '.join(fset), otypes=[object])
+itemset_len = np.vectorize(len, otypes=[np.int64])
+first_item = np.vectorize(lambda fset: next(iter(fset)), otypes=[object])
+
+# Mined frames are also saved as parquet next to the CSV so a fresh worker can
+# skip mining; frozensets are stored as sorted lists of basket column ids.
+def artifact_path(path, name):
+    return f"{os.path.splitext(path)[0]}.{name}_{MIN_SUPPORT}.parquet"
+
+# Schema metadata key recording which CSV (and catalogue) an artifact came from
+ARTIFACT_SOURCE_KEY = b"swiftcart_source"
+
+def artifact_source(path, mtime, columns):
+    # A CSV restored with its old mtime can carry a different catalogue, so the
+    # artifact is tied to the exact file and basket columns its ids refer to
+    return json.dumps({
+        'mtime': mtime, 'size': os.path.getsize(path), 'columns': list(columns)
+    }).encode()
+
+def load_artifact(path, mtime, name, columns, item_cols):
+    artifact = artifact_path(path, name)
+    if not os.path.exists(artifact):
+        return None
     try:
-        df = pd.read_csv("swiftcart_transactions_P4.csv")
-        df['Product_Name'] = df['Product_Name'].str.strip().str.title()
-        return df
-    except FileNotFoundError:
-        st.error("Data file not found. Please ensure 'swiftcart_transactions_P4.csv' is in the directory.")
-        return pd.DataFrame()
+        table = pq.read_table(artifact)
+        metadata = table.schema.metadata or {}
+        if metadata.get(ARTIFACT_SOURCE_KEY) != artifact_source(path, mtime, columns):
+            return None
+        frame = table.to_pandas()
+        id2name = np.asarray(columns)
+        for col in item_cols:
+            frame[col] = [frozenset(id2name[ids]) for ids in frame[col].values]
+    except (OSError, ValueError, IndexError):
+        # A truncated, corrupt or mismatched file is a cache miss; mining overwrites it
+        return None
+    return frame
+
+def save_artifact(frame, path, mtime, name, columns, item_cols):
+    name2id = {item: i for i, item in enumerate(columns)}
+    encoded = frame.assign(**{
+        col: [np.array(sorted(name2id[item] for item in fset), dtype=np.int32)
+              for fset in frame[col].values]
+        for col in item_cols
+    })
+    artifact = artifact_path(path, name)
+    try:
+        # Write beside the target and swap it in, so readers never see a
+        # half-written file even if the write is interrupted or races
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(artifact) or ".", suffix=".parquet.tmp")
+    except OSError:
+        # Read-only deployments just mine again next session
+        return
+    os.close(fd)
+    try:
+        table = pa.Table.from_pandas(encoded, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            ARTIFACT_SOURCE_KEY: artifact_source(path, mtime, columns),
+        })
+        pq.write_table(table, tmp)
+        # mkstemp creates the file owner-only; match a normally written file
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, artifact)
+    except OSError:
+        pass
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def pack_columns(basket):
+    # One row of packed uint64 words per product, with bit t set when
+    # transaction t contains it; an itemset's support count is then the
+    # popcount of the AND of its rows, 64 transactions per word.
+    coo = basket.sparse.to_coo()
+    packed = np.zeros((basket.shape[1], -(-basket.shape[0] // 64)), dtype=np.uint64)
+    tx = coo.row.astype(np.uint64)
+    np.bitwise_or.at(packed, (coo.col, tx // 64), np.uint64(1) << (tx % 64))
+    return packed
+
+def popcount(words):
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+def apriori_bitsets(basket, min_support):
+    # Level-wise apriori over packed columns; same itemsets, supports and order
+    # as mlxtend's apriori(..., use_colnames=True)
+    packed = pack_columns(basket)
+    n_tx = basket.shape[0]
+    names = np.asarray(basket.columns)
+    found = []
+    level = {}
+    for j in range(len(packed)):
+        support = popcount(packed[j]) / n_tx
+        if support >= min_support:
+            level[(j,)] = packed[j]
+            found.append((support, (j,)))
+    while level:
+        keys = sorted(level)
+        next_level = {}
+        for i, a in enumerate(keys):
+            for b in keys[i + 1:]:
+                if a[:-1] != b[:-1]:
+                    break
+                candidate = a + b[-1:]
+                # Downward closure: every k-subset must already be frequent
+                if any(candidate[:m] + candidate[m + 1:] not in level for m in range(len(candidate) - 2)):
+                    continue
+                bits = level[a] & packed[b[-1]]
+                support = popcount(bits) / n_tx
+                if support >= min_support:
+                    next_level[candidate] = bits
+                    found.append((support, candidate))
+        level = next_level
+    return pd.DataFrame({
+        'support': [support for support, _ in found],
+        'itemsets': [frozenset(names[list(ids)]) for _, ids in found],
+    })
+
+@st.cache_data
+def mine_itemsets(path, mtime):
+    basket = build_basket(path, mtime)
+    itemsets = load_artifact(path, mtime, "itemsets", basket.columns, ['itemsets'])
+    if itemsets is not None:
+        return itemsets
+    if basket.shape[1] < APRIORI_MAX_ITEMS:
+        itemsets = apriori_bitsets(basket, MIN_SUPPORT)
+    else:
+        # mlxtend is imported lazily: once results are on disk it is never needed
+        from mlxtend.frequent_patterns import fpgrowth
+        itemsets = fpgrowth(basket, min_support=MIN_SUPPORT, use_colnames=True)
+    # Itemset sizes computed once for every length-based filter
+    itemsets['length'] = itemset_len(itemsets['itemsets'].values).astype(np.int8)
+    save_artifact(itemsets, path, mtime, "itemsets", basket.columns, ['itemsets'])
+    return itemsets
+
+@st.cache_data
+def build_all_rules(path, mtime):
+    # Every rule over the MIN_SUPPORT itemsets, generated once. Stricter views
+    # are exact filters of this frame since support is anti-monotone.
+    columns = build_basket(path, mtime).columns
+    item_cols = ['antecedents', 'consequents']
+    rules = load_artifact(path, mtime, "rules", columns, item_cols)
+    if rules is None:
+        from mlxtend.frequent_patterns import association_rules
+        rules = association_rules(mine_itemsets(path, mtime), metric="confidence", min_threshold=0.0)
+        # float32 metrics halve the memory traffic of every later filter and sort
+        metrics = rules.select_dtypes('float64').columns
+        rules[metrics] = rules[metrics].astype(np.float32)
+        save_artifact(rules, path, mtime, "rules", columns, item_cols)
+    rules['antecedents_str'] = frozen_to_str(rules['antecedents'].values)
+    rules['consequents_str'] = frozen_to_str(rules['consequents'].values)
+    rules['rule_desc'] = rules['antecedents_str'] + " → " + rules['consequents_str']
+    return rules
 
-df = load_data()
+@st.cache_data
+def build_rules(path, mtime, min_support, metric, min_threshold, min_lift=None):
+    rules = build_all_rules(path, mtime)
+    keep = (rules['support'] >= min_support) & (rules[metric] >= min_threshold)
+    if min_lift is not None:
+        keep &= rules['lift'] > min_lift
+    return rules[keep].reset_index(drop=True)
+
+def encode_itemsets(itemsets, name2id):
+    # CSR layout: the item ids of itemsets[i] are indices[indptr[i]:indptr[i + 1]]
+    indptr = np.zeros(len(itemsets) + 1, dtype=np.int32)
+    np.cumsum(itemset_len(itemsets), out=indptr[1:])
+    indices = np.fromiter(
+        (name2id[item] for fset in itemsets for item in fset),
+        dtype=np.int32, count=indptr[-1]
+    )
+    return indptr, indices
+
+@st.cache_data
+def encode_rules(path, mtime, *rule_params):
+    # Columnar copy of the rules with item names replaced by basket column ids;
+    # strings are only decoded again (via the basket columns) for display.
+    rules = build_rules(path, mtime, *rule_params)
+    name2id = {name: i for i, name in enumerate(build_basket(path, mtime).columns)}
+    ant_indptr, ant_indices = encode_itemsets(rules['antecedents'].values, name2id)
+    con_indptr, con_indices = encode_itemsets(rules['consequents'].values, name2id)
+    return {
+        'ant_indptr': ant_indptr, 'ant_indices': ant_indices,
+        'con_indptr': con_indptr, 'con_indices': con_indices,
+        'confidence': rules['confidence'].to_numpy(),
+        'lift': rules['lift'].to_numpy(),
+    }
+
+@st.cache_data
+def build_antecedent_matrix(path, mtime, *rule_params):
+    # Row i flags the basket columns in rule i's antecedents, so filtering rules
+    # by product is a single column slice instead of a Python `in` per rule.
+    encoded = encode_rules(path, mtime, *rule_params)
+    ant_indptr = encoded['ant_indptr']
+    n_rules = len(ant_indptr) - 1
+    matrix = np.zeros((n_rules, build_basket(path, mtime).shape[1]), dtype=bool)
+    matrix[np.repeat(np.arange(n_rules), np.diff(ant_indptr)), encoded['ant_indices']] = True
+    return matrix
+
+def top_k_for_product(pid, ant_matrix, lift, k):
+    # Positions of the k highest-lift rules with product `pid` in their
+    # antecedents, strongest first; a partial sort keeps this O(R) per click.
+    candidates = np.flatnonzero(ant_matrix[:, pid])
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-lift[candidates], k - 1)[:k]]
+    return candidates[np.argsort(-lift[candidates], kind='stable')]
+
+# Charts are cached as PNG bytes keyed on the plotted values, so reruns with
+# unchanged data skip matplotlib layout and drawing. Caching rendered bytes
+# rather than Figure objects keeps matplotlib (which is not thread-safe) from
+# being drawn by several sessions at once. The helpers only use their own
+# fig/ax, never pyplot's "current figure", for the same reason.
+def fig_to_png(fig):
+    # Same savefig options st.pyplot uses; closing frees the figure from pyplot
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight', dpi=200)
+    plt.close(fig)
+    return buf.getvalue()
+
+@st.cache_data
+def make_top_items_fig(names, supports):
+    # Plotting (Dark Theme Compatible)
+    fig, ax = plt.subplots(figsize=(10, 5))
+    # Set dark background for plot
+    fig.patch.set_facecolor('#1E1E1E')
+    ax.set_facecolor('#1E1E1E')
+
+    ax.bar(names, supports, color='#00ADB5')
+
+    # Style axes for visibility on dark background
+    ax.tick_params(colors='white')
+    ax.xaxis.label.set_color('white')
+    ax.yaxis.label.set_color('white')
+    ax.title.set_color('white')
+    for spine in ax.spines.values():
+        spine.set_color('white')
+
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.set_xlabel("Product")
+    ax.set_ylabel("Support (Frequency)")
+    ax.set_title("Top 10 Most Frequent Items")
+    return fig_to_png(fig)
+
+@st.cache_data
+def make_lift_bar_fig(labels, lifts):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    # Transparent background
+    fig.patch.set_alpha(0)
+    ax.patch.set_alpha(0)
+    ax.tick_params(colors='white')
+    ax.xaxis.label.set_color('white')
+    ax.yaxis.label.set_color('white')
+    ax.title.set_color('white')
+    for spine in ax.spines.values():
+        spine.set_color('white')
+
+    ax.barh(labels, lifts, color='#00ADB5')
+    ax.set_xlabel("Lift")
+    ax.set_title("Top 10 Association Rules by Lift")
+    ax.invert_yaxis() # Invert to show highest at top
+    fig.tight_layout()
+    return fig_to_png(fig)
+
+@st.cache_data
+def compute_layout(edges):
+    # Seeded so the network keeps the same shape across reruns and sessions
+    # (networkx is imported here, not at the top, to keep cold starts fast)
+    import networkx as nx
+    G = nx.DiGraph()
+    G.add_weighted_edges_from(edges)
+    return nx.spring_layout(G, k=2.5, seed=42) # k controls spacing
+
+@st.cache_data
+def make_network_fig(edges):
+    import networkx as nx
+    G = nx.DiGraph()
+    G.add_weighted_edges_from(edges)
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    # Transparent background
+    fig.patch.set_alpha(0)
+    ax.patch.set_alpha(0)
+
+    pos = compute_layout(edges)
+    weights = [G[u][v]['weight'] for u,v in G.edges()]
+
+    # Normalize weights for visibility
+    width = [w * 1.5 for w in weights]  # Increased width for better visibility
+
+    nx.draw(
+        G, pos,
+        with_labels=True,
+        node_size=3000,
+        node_color='#00ADB5',
+        edge_color='white', 
+        font_color='black', # Black text on nodes might be more readable on teal nodes
+        font_weight='bold',
+        width=width,
+        ax=ax,
+        arrows=True,
+        arrowstyle='->', 
+        arrowsize=20
+    )
+    ax.set_title("Product Association Network (Top 20 Rules)", color='white')
+    return fig_to_png(fig)
+
+@st.cache_data
+def make_heatmap_fig(pivot_data):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    # Transparent background
+    fig.patch.set_alpha(0)
+    ax.patch.set_alpha(0)
+
+    # Heatmap drawn straight from the NumPy grid; missing pairs stay blank
+    values = pivot_data.to_numpy()
+    im = ax.imshow(values, cmap='viridis', aspect='auto')
+    ax.set_xticks(range(values.shape[1]))
+    ax.set_xticklabels(pivot_data.columns, rotation=45, ha='right')
+    ax.set_yticks(range(values.shape[0]))
+    ax.set_yticklabels(pivot_data.index)
+
+    # Annotate cells unless the grid is too dense to read
+    if max(values.shape) <= 12:
+        for (i, j), value in np.ndenumerate(values):
+            if not np.isnan(value):
+                r, g, b, _ = im.cmap(im.norm(value))
+                # Dark text on the bright end of the colormap, light text elsewhere
+                color = 'black' if 0.299 * r + 0.587 * g + 0.114 * b > 0.5 else 'white'
+                ax.text(j, i, f"{value:.2f}", ha='center', va='center', color=color)
+
+    # Fix text colors
+    cbar = fig.colorbar(im, ax=ax)
+    cbar.ax.tick_params(colors='white')
+    cbar.set_label('Lift Score', color='white')
+
+    ax.tick_params(colors='white')
+    ax.set_xlabel("Consequent (Likely to Buy)", color='white')
+    ax.set_ylabel("Antecedent (If they buy...)", color='white')
+    ax.set_title("Top 10 Association Rules Heatmap", color='white')
+    return fig_to_png(fig)
+
+# (min_support, metric, min_threshold, min_lift) of the main rule set
+RULE_PARAMS = (MIN_SUPPORT, "confidence", 0.3, 1.0)
+
+try:
+    data_mtime = os.path.getmtime(DATA_PATH)
+    df = load_data(DATA_PATH, data_mtime)
+except FileNotFoundError:
+    st.error(f"Data file not found. Please ensure '{DATA_PATH}' is in the directory.")
+    df = pd.DataFrame()
 
 if not df.empty:
     # Data Preprocessing
-    transactions = df.groupby('Transaction_ID')['Product_Name'].apply(list).values
-    te = TransactionEncoder()
-    te_array = te.fit(transactions).transform(transactions)
-    basket = pd.DataFrame(te_array, columns=te.columns_)
+    basket = build_basket(DATA_PATH, data_mtime)
 
     # Association Rule Mining
-    frequent_itemsets = apriori(basket, min_support=0.01, use_colnames=True)
-    rules = association_rules(frequent_itemsets, metric="confidence", min_threshold=0.3)
-    rules = rules[rules['lift'] > 1.0]
-
-    # Helper to convert frozenset to string
-    def frozen_to_str(fset):
-        return ', '.join(list(fset))
-
-    rules['antecedents_str'] = rules['antecedents'].apply(frozen_to_str)
-    rules['consequents_str'] = rules['consequents'].apply(frozen_to_str)
-    rules['rule_desc'] = rules['antecedents_str'] + " → " + rules['consequents_str']
+    frequent_itemsets = mine_itemsets(DATA_PATH, data_mtime)
+    rules = build_rules(DATA_PATH, data_mtime, *RULE_PARAMS)
+    rule_arrays = encode_rules(DATA_PATH, data_mtime, *RULE_PARAMS)
+    ant_matrix = build_antecedent_matrix(DATA_PATH, data_mtime, *RULE_PARAMS)
 
     # Sidebar Navigation
     with st.sidebar:
@@ -144,7 +514,7 @@ if not df.empty:
         st.dataframe(df.head(), use_container_width=True)
         
         st.markdown("### Top Selling Products (Raw Count)")
-        top_products = df['Product_Name'].value_counts().head(10)
+        top_products = df['Product_Name'].value_counts(sort=False).nlargest(10)
         st.bar_chart(top_products)
         st.caption("This chart shows the absolute number of times each product appears in the purchase records.")
 
@@ -152,31 +522,11 @@ if not df.empty:
         st.subheader(" Frequent Itemsets")
         st.markdown("Items that appear most often in transaction baskets.")
 
-        single_items = frequent_itemsets[frequent_itemsets['itemsets'].apply(lambda x: len(x)==1)].copy()
-        single_items['item_name'] = single_items['itemsets'].apply(frozen_to_str)
-        single_items = single_items.sort_values(by='support', ascending=False).head(10)
+        single_items = frequent_itemsets[frequent_itemsets['length'] == 1]
+        single_items = single_items.nlargest(10, 'support')
+        item_names = frozen_to_str(single_items['itemsets'].values)
 
-        # Plotting (Dark Theme Compatible)
-        fig, ax = plt.subplots(figsize=(10, 5))
-        # Set dark background for plot
-        fig.patch.set_facecolor('#1E1E1E')
-        ax.set_facecolor('#1E1E1E')
-        
-        ax.bar(single_items['item_name'], single_items['support'], color='#00ADB5')
-        
-        # Style axes for visibility on dark background
-        ax.tick_params(colors='white')
-        ax.xaxis.label.set_color('white')
-        ax.yaxis.label.set_color('white')
-        ax.title.set_color('white')
-        for spine in ax.spines.values():
-            spine.set_color('white')
-
-        plt.xticks(rotation=45)
-        plt.xlabel("Product")
-        plt.ylabel("Support (Frequency)")
-        plt.title("Top 10 Most Frequent Items")
-        st.pyplot(fig)
+        st.image(make_top_items_fig(tuple(item_names), tuple(single_items['support'])), width="stretch")
         
         st.info("📝 **Interpretation:** These are your 'anchor' products. High support means they are purchased in a high percentage of all transactions. Ensure these are always in stock.")
 
@@ -191,20 +541,24 @@ if not df.empty:
             st.markdown("Identifying items frequently bought with this product.")
         
         with col2:
-            filtered_rules = rules[rules['antecedents'].apply(lambda x: product in x)].copy()
+            top3 = top_k_for_product(
+                basket.columns.get_loc(product), ant_matrix, rule_arrays['lift'], 3
+            )
             
-            if not filtered_rules.empty:
-                top3 = filtered_rules.sort_values(by='lift', ascending=False).head(3)
-                
+            if len(top3):
                 st.success(f"Top Recommendations for **{product}**:")
                 
-                for idx, row in top3.iterrows():
+                # Read straight from the columnar rule arrays, decoding ids to names
+                id2name = np.asarray(basket.columns)
+                con_indptr, con_indices = rule_arrays['con_indptr'], rule_arrays['con_indices']
+                for i in top3:
+                    consequents = ', '.join(id2name[con_indices[con_indptr[i]:con_indptr[i + 1]]])
                     with st.container():
-                        st.markdown(f"### 🔗 Recommend: **{row['consequents_str']}**")
+                        st.markdown(f"### 🔗 Recommend: **{consequents}**")
                         # Metric Cards inside recommendation
                         c1, c2 = st.columns(2)
-                        c1.metric("Confidence", f"{row['confidence']:.1%}", help="Probability customer creates this purchase")
-                        c2.metric("Lift", f"{row['lift']:.2f}x", help="How much more likely than random chance")
+                        c1.metric("Confidence", f"{rule_arrays['confidence'][i]:.1%}", help="Probability customer creates this purchase")
+                        c2.metric("Lift", f"{rule_arrays['lift'][i]:.2f}x", help="How much more likely than random chance")
                         st.markdown("---")
             else:
                 st.warning("No strong association rules found for this product. Try selecting a more common item.")
@@ -216,7 +570,7 @@ if not df.empty:
         st.subheader("🏆 Top 5 Golden Rules")
         st.markdown("The strongest discovered relationships with highest **Lift**.")
 
-        top5 = rules.sort_values(by='lift', ascending=False).head(10)
+        top5 = rules.nlargest(10, 'lift')
 
         for i, row in top5.iterrows():
             with st.expander(f"Rule #{i+1}: {row['antecedents_str']} → {row['consequents_str']}", expanded=True):
@@ -229,143 +583,60 @@ if not df.empty:
 
     elif menu == "Advanced Visualizations":
         st.subheader("📊 Advanced Market Basket Analysis")
-        st.markdown("Deep dive into association rules using FP-Growth and Network Analysis.")
-
-        # FP-Growth
-        st.markdown("### 1. FP-Growth Algorithm Results")
-        with st.spinner("Running FP-Growth..."):
-             
-             frequent_itemsets_fp = fpgrowth(basket, min_support=0.05, use_colnames=True)
-             
-             # Generate rules from FP-Growth results
-             rules_fp = association_rules(frequent_itemsets_fp, metric="lift", min_threshold=1.0)
-             rules_sorted_fp = rules_fp.sort_values(by='lift', ascending=False)
+        st.markdown("Deep dive into the strongest itemsets and rules (support ≥ 5%) with Network Analysis.")
+
+        st.markdown("### 1. High-Support Itemsets & Rules (Support ≥ 0.05)")
+        # Stricter view of the shared itemsets and rules; no second mining pass
+        frequent_itemsets_fp = frequent_itemsets[frequent_itemsets['support'] >= 0.05]
+        rules_fp = build_rules(DATA_PATH, data_mtime, 0.05, "lift", 1.0)
         
-        st.success("FP-Growth Analysis Complete!")
         st.write(f"Found {len(frequent_itemsets_fp)} frequent itemsets and {len(rules_fp)} association rules.")
         
-        st.markdown("#### Top 20 Frequent Itemsets (FP-Growth)")
+        st.markdown("#### Top 20 Frequent Itemsets (Support ≥ 0.05)")
         
         # Clean up frozenset display
-        fp_display = frequent_itemsets_fp.sort_values(by='support', ascending=False).head(20).copy()
-        fp_display['itemsets'] = fp_display['itemsets'].apply(lambda x: ', '.join(list(x)))
+        fp_display = frequent_itemsets_fp.nlargest(20, 'support')[['support', 'itemsets']]
+        fp_display['itemsets'] = frozen_to_str(fp_display['itemsets'].values)
         st.dataframe(fp_display)
 
         # 1. Bar Chart: Lift
         st.markdown("### 2. Top 20 Association Rules by Lift")
-        top_rules_fp = rules_sorted_fp.head(20)
+        top_rules_fp = rules_fp.nlargest(20, 'lift')
+        # Handling potentially multiple items in antecedents/consequents by taking the first one
+        top_ants = first_item(top_rules_fp['antecedents'].values)
+        top_cons = first_item(top_rules_fp['consequents'].values)
+        top_lifts = top_rules_fp['lift'].to_numpy()
         
         if not top_rules_fp.empty:
-            labels=[
-                f"{list(r['antecedents'])[0]} → {list(r['consequents'])[0]}"
-                for _ ,r in top_rules_fp.iterrows()
-            ]
-
-            fig, ax = plt.subplots(figsize=(10, 5))
-            # Transparent background
-            fig.patch.set_alpha(0)
-            ax.patch.set_alpha(0)
-            ax.tick_params(colors='white')
-            ax.xaxis.label.set_color('white')
-            ax.yaxis.label.set_color('white')
-            ax.title.set_color('white')
-            for spine in ax.spines.values():
-                spine.set_color('white')
-
-            plt.barh(labels, top_rules_fp['lift'], color='#00ADB5')
-            plt.xlabel("Lift")
-            plt.title("Top 10 Association Rules by Lift")
-            plt.gca().invert_yaxis() # Invert to show highest at top
-            plt.tight_layout()
-            st.pyplot(fig)
+            labels = top_ants + " → " + top_cons
+
+            st.image(make_lift_bar_fig(tuple(labels), tuple(top_lifts)), width="stretch")
         else:
             st.warning("No rules found with sufficient lift.")
 
         # 2. Network Graph
         st.markdown("### 3. Product Association Network")
         if not top_rules_fp.empty:
-            G = nx.DiGraph()
-            for _, row in top_rules_fp.iterrows():
-                # Handling potentially multiple items in antecedents/consequents by taking the first one
-                # as per the user snippet: list(row['...'])[0]
-                ant = list(row['antecedents'])[0]
-                con = list(row['consequents'])[0]
-                G.add_edge(ant, con, weight=row['lift'])
-            
-            fig, ax = plt.subplots(figsize=(10, 8))
-            # Transparent background
-            fig.patch.set_alpha(0)
-            ax.patch.set_alpha(0)
-            
-            pos = nx.spring_layout(G, k=2.5) # k controls spacing
-            weights = [G[u][v]['weight'] for u,v in G.edges()]
-            
-            # Normalize weights for visibility
-            width = [w * 1.5 for w in weights]  # Increased width for better visibility
-
-            nx.draw(
-                G, pos,
-                with_labels=True,
-                node_size=3000,
-                node_color='#00ADB5',
-                edge_color='white', 
-                font_color='black', # Black text on nodes might be more readable on teal nodes
-                font_weight='bold',
-                width=width,
-                ax=ax,
-                arrows=True,
-                arrowstyle='->', 
-                arrowsize=20
-            )
-            plt.title("Product Association Network (Top 20 Rules)", color='white')
-            st.pyplot(fig)
+            st.image(make_network_fig(tuple(zip(top_ants, top_cons, top_lifts))), width="stretch")
 
         # 3. Heatmap
         st.markdown("### 4. Association Rules Heatmap")
         
-        # Prepare data for heatmap
-        rules_fp['ant_str'] = rules_fp['antecedents'].apply(lambda x: ', '.join(list(x)))
-        rules_fp['con_str'] = rules_fp['consequents'].apply(lambda x: ', '.join(list(x)))
-        
-        top_rules_heatmap = rules_fp.sort_values('lift', ascending=False).head(10)
+        # Prepare data for heatmap: take the top 10 rows first, keep only the
+        # columns the grid needs, then reshape
+        top_rules_heatmap = rules_fp.nlargest(10, 'lift')[['antecedents_str', 'consequents_str', 'lift']]
         
         if not top_rules_heatmap.empty:
              try:
-                pivot_data = top_rules_heatmap.pivot_table(
-                    index='ant_str',
-                    columns='con_str',
-                    values='lift',
-                    aggfunc='max'
+                # Each (antecedents, consequents) pair is a distinct rule, so a
+                # plain pivot suffices; no groupby aggregation is needed
+                pivot_data = top_rules_heatmap.pivot(
+                    index='antecedents_str',
+                    columns='consequents_str',
+                    values='lift'
                 )
                 
-                fig, ax = plt.subplots(figsize=(12, 8))
-                # Transparent background
-                fig.patch.set_alpha(0)
-                ax.patch.set_alpha(0)
-                
-                # Heatmap
-                sns.heatmap(
-                    pivot_data,
-                    annot=True,
-                    cmap='viridis',
-                    fmt='.2f',
-                    cbar_kws={'label': 'Lift Score'},
-                    ax=ax
-                )
-                
-                # Fix text colors
-                cbar = ax.collections[0].colorbar
-                cbar.ax.tick_params(colors='white')
-                cbar.set_label('Lift Score', color='white')
-                
-                ax.tick_params(colors='white')
-                plt.xlabel("Consequent (Likely to Buy)", color='white')
-                plt.ylabel("Antecedent (If they buy...)", color='white')
-                plt.title("Top 10 Association Rules Heatmap", color='white')
-                plt.xticks(rotation=45, ha='right')
-                plt.yticks(rotation=0)
-                
-                st.pyplot(fig)
+                st.image(make_heatmap_fig(pivot_data), width="stretch")
              except Exception as e:
                  st.error(f"Could not generate heatmap: {e}")
         else:
@@ -382,7 +653,7 @@ if not df.empty:
             with col1:
                  st.info("Based on high lift pairs, we recommend placing these items near each other to trigger impulse buys.")
             
-            layout_suggestions = rules.sort_values(by='lift', ascending=False).head(1)
+            layout_suggestions = rules.nlargest(1, 'lift')
             for _, row in layout_suggestions.iterrows():
                  st.success(f"**Action:** Place **{row['consequents_str']}** racks next to the **{row['antecedents_str']}** aisle.")
                  
@@ -394,7 +665,7 @@ if not df.empty:
             st.markdown("### Digital \"Recommended for You\" Bundles")
             st.info("Use these combinations for 'Buy Together & Save' app promotions.")
             
-            bundle_suggestions = rules.sort_values(by='confidence', ascending=False).head(3)
+            bundle_suggestions = rules.nlargest(3, 'confidence')
             
             for _, row in bundle_suggestions.iterrows():
                 st.markdown(f"**📦 Bundle Opportunity:** {row['antecedents_str']} + {row['consequents_str']}")